@@ -5,29 +5,74 @@
 """
 
 import json
-import sys
 import os
+import sys
 from datetime import datetime
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+WORKSPACE = Path("/root/.openclaw/workspace")
+DECISIONS_DIR = WORKSPACE / "life" / "decisions"
+# 索引为追加写的 JSONL，每行一条决策摘要；统计信息单独存放
+INDEX_FILE = DECISIONS_DIR / "index.jsonl"
+STATS_FILE = DECISIONS_DIR / "stats.json"
+LEGACY_INDEX_FILE = DECISIONS_DIR / "index.json"
+
+def json_loads(data):
+    """解析 JSON（str 或 bytes），装了 orjson 时用 orjson"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
-WORKSPACE = "/root/.openclaw/workspace"
-INDEX_FILE = f"{WORKSPACE}/life/decisions/index.json"
-DECISIONS_DIR = f"{WORKSPACE}/life/decisions"
+def json_bytes(obj, indent=False):
+    """序列化为 UTF-8 JSON 字节串，装了 orjson 时用 orjson"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+def replace_file(path: Path, data: bytes):
+    """先写临时文件再 os.replace 原子替换，中途失败不会留下写了一半的文件"""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def migrate_legacy_index():
+    """把旧版 index.json 拆分为 index.jsonl + stats.json（仅执行一次）"""
+    # 直接打开而不是先 exists 再 open：迁移完成后只剩一次失败的 open
+    try:
+        legacy = json_loads(LEGACY_INDEX_FILE.read_bytes())
+    except FileNotFoundError:
+        return
+    # index.json 存在说明迁移尚未完成，期间不会有新决策追加，
+    # 所以总是从它完整重建两个文件，两个都替换成功后才删除旧文件
+    replace_file(INDEX_FILE, b"".join(json_bytes(d) + b"\n" for d in legacy.get("decisions", [])))
+    replace_file(STATS_FILE, json_bytes(legacy.get("stats", {}), indent=True))
+    LEGACY_INDEX_FILE.unlink()
 
 def create_decision(title: str, context: str, reason: str, options: list = None):
     """创建决策记录"""
     
     # 确保目录存在
-    os.makedirs(DECISIONS_DIR, exist_ok=True)
+    DECISIONS_DIR.mkdir(parents=True, exist_ok=True)
     
-    # 读取索引
-    if os.path.exists(INDEX_FILE):
-        with open(INDEX_FILE, 'r', encoding='utf-8') as f:
-            index = json.load(f)
-    else:
-        index = {"decisions": [], "stats": {}}
+    migrate_legacy_index()
     
-    # 生成决策 ID
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    # 读取统计（大小固定，不随决策数增长）
+    try:
+        with open(STATS_FILE, 'rb') as f:
+            stats = json_loads(f.read())
+    except FileNotFoundError:
+        stats = {}
+    
+    # 生成决策 ID（ID、created_at、last_updated 共用同一时刻）
+    now = datetime.now()
+    now_iso = now.isoformat()
+    timestamp = now.strftime("%Y%m%d-%H%M%S")
     decision_id = f"dec-{timestamp}"
     
     # 创建决策记录
@@ -38,26 +83,31 @@ def create_decision(title: str, context: str, reason: str, options: list = None)
         "options": options or [],
         "selected": 0,
         "reason": reason,
-        "created_at": datetime.now().isoformat(),
+        "created_at": now_iso,
         "status": "active"
     }
     
     # 保存决策文件
-    decision_file = f"{DECISIONS_DIR}/{decision_id}.json"
-    with open(decision_file, 'w', encoding='utf-8') as f:
-        json.dump(decision, f, ensure_ascii=False, indent=2)
+    decision_file = DECISIONS_DIR / f"{decision_id}.json"
+    data = json_bytes(decision, indent=True)
+    with open(decision_file, 'wb') as f:
+        f.write(data)
     
-    # 更新索引
-    index["decisions"].append({
+    # 追加索引，O(1)，不重写已有条目
+    entry = json_bytes({
         "id": decision_id,
         "title": title,
         "created_at": decision["created_at"]
     })
-    index["stats"]["total"] = len(index["decisions"])
-    index["stats"]["last_updated"] = datetime.now().isoformat()
+    with open(INDEX_FILE, 'ab') as f:
+        f.write(entry + b"\n")
+    
+    stats["total"] = stats.get("total", 0) + 1
+    stats["last_updated"] = now_iso
     
-    with open(INDEX_FILE, 'w', encoding='utf-8') as f:
-        json.dump(index, f, ensure_ascii=False, indent=2)
+    data = json_bytes(stats, indent=True)
+    with open(STATS_FILE, 'wb') as f:
+        f.write(data)
     
     print(f"✓ 决策已记录：{decision_id}")
     print(f"  标题：{title}")
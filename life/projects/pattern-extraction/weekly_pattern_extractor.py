@@ -8,41 +8,48 @@ import os
 import re
 from datetime import datetime, timedelta
 from collections import Counter
+from pathlib import Path
 
 WORKSPACE = "/root/.openclaw/workspace"
 MEMORY_DIR = f"{WORKSPACE}/memory"
 OUTPUT_DIR = f"{WORKSPACE}/life/projects/pattern-extraction"
 
+# 中文双字及以上词，模块加载时编译一次
+CJK_WORD = re.compile(r'[\u4e00-\u9fff]{2,}')
+
 def extract_patterns(days: int = 7):
     """提取最近 N 天的模式"""
     
-    # 收集日志内容
-    all_content = []
+    # 逐文件统计词频，不保留全文
+    word_counter = Counter()
+    file_count = 0
     cutoff_date = datetime.now() - timedelta(days=days)
+    cutoff_str = cutoff_date.strftime('%Y-%m-%d')
     
     if os.path.exists(MEMORY_DIR):
-        for filename in os.listdir(MEMORY_DIR):
-            if filename.endswith('.md') and not filename.startswith('MEMORY-backup'):
-                # 尝试从文件名解析日期
+        with os.scandir(MEMORY_DIR) as it:
+            for entry in it:
+                if not entry.name.endswith('.md') or entry.name.startswith('MEMORY-backup'):
+                    continue
+                # 文件名为 YYYY-MM-DD.md，ISO 日期按字符串比较即按时间比较
+                date_str = entry.name[:-3]
+                if len(date_str) != 10 or date_str[4] != '-' or date_str[7] != '-':
+                    continue
+                if date_str <= cutoff_str:
+                    continue
                 try:
-                    date_str = filename.replace('.md', '')
-                    file_date = datetime.strptime(date_str, '%Y-%m-%d')
-                    if file_date >= cutoff_date:
-                        with open(os.path.join(MEMORY_DIR, filename), 'r', encoding='utf-8') as f:
-                            all_content.append(f.read())
-                except:
-                    pass
+                    text = Path(entry.path).read_text(encoding='utf-8')
+                except (OSError, UnicodeDecodeError):
+                    continue
+                word_counter.update(CJK_WORD.findall(text))
+                file_count += 1
     
-    if not all_content:
+    if not file_count:
         print("没有找到最近的日志文件")
         return
     
-    # 合并内容
-    full_text = "\n".join(all_content)
-    
     # 提取高频词（简化版）
-    words = re.findall(r'[\u4e00-\u9fff]{2,}', full_text)  # 中文双字词
-    word_counts = Counter(words).most_common(20)
+    word_counts = word_counter.most_common(20)
     
     # 生成报告
     os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -30,8 +30,8 @@ if [ -f "$WORKSPACE/MEMORY.md" ]; then
 fi
 
 # 3. 决策日志统计
-if [ -f "$WORKSPACE/life/decisions/index.json" ]; then
-    DECISION_COUNT=$(cat "$WORKSPACE/life/decisions/index.json" | grep -c '"id"' || echo 0)
+if [ -f "$WORKSPACE/life/decisions/index.jsonl" ]; then
+    DECISION_COUNT=$(wc -l < "$WORKSPACE/life/decisions/index.jsonl")
     echo "## 决策追踪" >> "$REPORT_FILE"
     echo "- 累计决策数：$DECISION_COUNT" >> "$REPORT_FILE"
     echo "" >> "$REPORT_FILE"
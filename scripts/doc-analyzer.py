@@ -10,16 +10,28 @@ def analyze_file(filepath):
         print(f"Error: File not found: {filepath}")
         return
     
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
+    size = os.stat(filepath).st_size
+    
+    # 分块统计行数，不把整个文件读进内存
+    nlines = 0
+    last = b''
+    with open(filepath, 'rb') as f:
+        while chunk := f.read(1 << 20):
+            nlines += chunk.count(b'\n')
+            last = chunk
+    if last and not last.endswith(b'\n'):
+        nlines += 1
+    
+    with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
+        preview = f.read(500)
     
     print(f"\n{'='*60}")
     print(f"📄 文件：{filepath}")
     print(f"{'='*60}")
-    print(f"字数：{len(content)} 字符")
-    print(f"行数：{len(content.splitlines())} 行")
+    print(f"大小：{size} 字节")
+    print(f"行数：{nlines} 行")
     print(f"\n📝 内容预览（前 500 字）：\n")
-    print(content[:500])
+    print(preview)
     print("\n...")
     print(f"\n{'='*60}")
 
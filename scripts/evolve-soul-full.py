@@ -7,6 +7,8 @@ SOUL.md 完整进化脚本
 import json
 import subprocess
 import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -14,19 +16,31 @@ WORKSPACE = Path("/root/.openclaw/workspace")
 SOUL_FILE = WORKSPACE / "SOUL.md"
 BACKUP_DIR = WORKSPACE / "memory"
 
-def run_command(cmd: str) -> str:
-    """运行 shell 命令并返回输出"""
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+# 洞察类型的中文名称
+TYPE_NAMES = {
+    'behavioral': '行为模式',
+    'personality': '人格特质',
+    'relational': '关系动态',
+    'principle': '核心原则',
+    'skill': '技能经验'
+}
+
+def run_command(argv: list) -> str:
+    """直接运行命令（不经过 shell）并返回输出，stderr 丢弃"""
+    try:
+        result = subprocess.run(argv, capture_output=True, text=True, check=False)
+    except FileNotFoundError:
+        return ""
     return result.stdout.strip()
 
 def get_chitin_stats() -> dict:
     """获取 Chitin 统计信息"""
-    stats_output = run_command("chitin stats 2>/dev/null")
+    stats_output = run_command(["chitin", "stats"])
     return {"raw": stats_output}
 
 def get_insights_by_type(insight_type: str, limit: int = 5) -> list:
     """获取指定类型的洞察"""
-    output = run_command(f"chitin list --type {insight_type} --json 2>/dev/null")
+    output = run_command(["chitin", "list", "--type", insight_type, "--json"])
     if not output:
         return []
     try:
@@ -49,16 +63,14 @@ def generate_personality_section() -> str:
     # 获取各类洞察
     types = ['behavioral', 'personality', 'relational', 'principle', 'skill']
     
+    # 各类型的 chitin 调用互不依赖，并发执行
+    with ThreadPoolExecutor(max_workers=len(types)) as pool:
+        results = dict(zip(types, pool.map(lambda t: get_insights_by_type(t, limit=3), types)))
+    
     for insight_type in types:
-        insights = get_insights_by_type(insight_type, limit=3)
+        insights = results[insight_type]
         if insights:
-            type_name = {
-                'behavioral': '行为模式',
-                'personality': '人格特质',
-                'relational': '关系动态',
-                'principle': '核心原则',
-                'skill': '技能经验'
-            }.get(insight_type, insight_type)
+            type_name = TYPE_NAMES.get(insight_type, insight_type)
             
             sections.append(f"### {type_name}")
             for insight in insights:
@@ -74,7 +86,7 @@ def evolve_soul():
     # 备份当前 SOUL.md
     if SOUL_FILE.exists():
         backup_path = BACKUP_DIR / f"chitin-soul-backup-{timestamp}.md"
-        backup_path.write_text(SOUL_FILE.read_text(encoding='utf-8'), encoding='utf-8')
+        shutil.copyfile(SOUL_FILE, backup_path)
         print(f"✓ SOUL.md 已备份至 {backup_path}")
     
     # 获取统计
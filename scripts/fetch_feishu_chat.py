@@ -1,35 +1,70 @@
 #!/usr/bin/env python3
 """Fetch chat history from Feishu/Lark API."""
 
-import requests
 import json
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Feishu API endpoints
 FEISHU_TOKEN_URL = "https://open.feishu.com/open-apis/auth/v3/tenant_access_token/internal"
 FEISHU_CHAT_LIST_URL = "https://open.feishu.com/open-apis/im/v1/chats"
 FEISHU_MESSAGE_LIST_URL = "https://open.feishu.com/open-apis/im/v1/messages"
 
-def get_tenant_token(app_id, app_secret):
+# (connect, read) timeout in seconds for every API call
+REQUEST_TIMEOUT = (3.05, 30)
+
+def json_loads(data):
+    """Parse JSON from str or bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_bytes(obj, indent=False):
+    """Serialize obj to UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+def make_session():
+    """Create a session that retries transient 429/5xx responses with backoff."""
+    retry = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "POST"]),
+        raise_on_status=False,
+    )
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(max_retries=retry))
+    return session
+
+def get_tenant_token(session, app_id, app_secret):
     """Get tenant access token."""
     payload = {
         "app_id": app_id,
         "app_secret": app_secret
     }
-    response = requests.post(FEISHU_TOKEN_URL, json=payload)
-    result = response.json()
+    response = session.post(FEISHU_TOKEN_URL, json=payload, timeout=REQUEST_TIMEOUT)
+    result = json_loads(response.content)
     if result.get("code") != 0:
         raise Exception(f"Failed to get token: {result}")
     return result["tenant_access_token"]
 
-def get_chat_id(token, user_id):
+def get_chat_id(session, user_id):
     """Get chat ID for a user."""
-    headers = {"Authorization": f"Bearer {token}"}
     params = {"user_id": user_id}
-    response = requests.get(FEISHU_CHAT_LIST_URL, headers=headers, params=params)
-    result = response.json()
+    response = session.get(FEISHU_CHAT_LIST_URL, params=params, timeout=REQUEST_TIMEOUT)
+    result = json_loads(response.content)
     if result.get("code") != 0:
         raise Exception(f"Failed to get chat: {result}")
     
@@ -38,49 +73,62 @@ def get_chat_id(token, user_id):
         return items[0]["chat_id"]
     return None
 
-def get_messages(token, chat_id, user_id, page_size=50):
-    """Get messages from a chat."""
-    headers = {"Authorization": f"Bearer {token}"}
+def parse_page(items, user_id):
+    """Filter one page of messages down to those sent by the target user."""
+    messages = []
+    for msg in items:
+        # Filter messages from target user
+        if msg.get("sender_id", {}).get("user_id") == user_id:
+            content = msg.get("content", "{}")
+            if isinstance(content, str):
+                content = json_loads(content)
+            messages.append({
+                "message_id": msg.get("message_id"),
+                "sender_id": msg.get("sender_id", {}).get("user_id"),
+                "content": content.get("text", ""),
+                "create_time": msg.get("create_time"),
+            })
+    return messages
+
+def get_messages(session, chat_id, user_id, page_size=50):
+    """Get messages from a chat.
+
+    Pages are parsed on a worker thread so the request for the next page
+    is already in flight while the previous one is being filtered.
+    """
     params = {
         "chat_id": chat_id,
         "msg_type": "text",
         "page_size": page_size
     }
     
-    messages = []
+    pages = []
     page_token = None
     
-    while True:
-        if page_token:
-            params["page_token"] = page_token
-        
-        response = requests.get(FEISHU_MESSAGE_LIST_URL, headers=headers, params=params)
-        result = response.json()
-        
-        if result.get("code") != 0:
-            print(f"Error fetching messages: {result}")
-            break
-        
-        items = result.get("data", {}).get("items", [])
-        for msg in items:
-            # Filter messages from target user
-            if msg.get("sender_id", {}).get("user_id") == user_id:
-                content = msg.get("content", "{}")
-                if isinstance(content, str):
-                    content = json.loads(content)
-                messages.append({
-                    "message_id": msg.get("message_id"),
-                    "sender_id": msg.get("sender_id", {}).get("user_id"),
-                    "content": content.get("text", ""),
-                    "create_time": msg.get("create_time"),
-                })
-        
-        has_more = result.get("data", {}).get("has_more", False)
-        if not has_more:
-            break
-        
-        page_token = result.get("data", {}).get("page_token")
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        while True:
+            if page_token:
+                params["page_token"] = page_token
+            
+            response = session.get(FEISHU_MESSAGE_LIST_URL, params=params, timeout=REQUEST_TIMEOUT)
+            result = json_loads(response.content)
+            
+            if result.get("code") != 0:
+                print(f"Error fetching messages: {result}")
+                break
+            
+            items = result.get("data", {}).get("items", [])
+            pages.append(pool.submit(parse_page, items, user_id))
+            
+            has_more = result.get("data", {}).get("has_more", False)
+            if not has_more:
+                break
+            
+            page_token = result.get("data", {}).get("page_token")
     
+    messages = []
+    for page in pages:
+        messages.extend(page.result())
     return messages
 
 def main():
@@ -99,13 +147,17 @@ def main():
     
     print(f"Fetching messages from Feishu for user: {user_id}")
     
+    # Reuse one keep-alive connection for all API calls
+    session = make_session()
+    
     # Get token
     print("Getting access token...")
-    token = get_tenant_token(app_id, app_secret)
+    token = get_tenant_token(session, app_id, app_secret)
+    session.headers.update({"Authorization": f"Bearer {token}"})
     
     # Get chat ID
     print("Getting chat ID...")
-    chat_id = get_chat_id(token, user_id)
+    chat_id = get_chat_id(session, user_id)
     if not chat_id:
         print("No chat found with this user")
         sys.exit(1)
@@ -114,7 +166,7 @@ def main():
     
     # Get messages
     print("Fetching messages...")
-    messages = get_messages(token, chat_id, user_id)
+    messages = get_messages(session, chat_id, user_id)
     
     print(f"Fetched {len(messages)} messages from target user")
     
@@ -127,8 +179,8 @@ def main():
     }
     
     os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    with open(output_file, 'wb') as f:
+        f.write(json_bytes(output, indent=True))
     
     print(f"Messages saved to: {output_file}")
 
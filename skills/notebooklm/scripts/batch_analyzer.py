@@ -5,6 +5,7 @@ Analyze multiple local files and create summary report
 """
 
 import argparse
+import re
 import sys
 from pathlib import Path
 
@@ -41,9 +42,19 @@ def main():
         "Marketing": ["marketing", "sales", "customer", "brand"]
     }
 
+    # Lowercase each name once and match all keywords of a category in one pass
+    file_names = [(f, f.name.lower()) for f in files]
+    category_patterns = {
+        category: re.compile('|'.join(re.escape(k) for k in keywords))
+        for category, keywords in analysis_plan.items()
+    }
+    keyword_pattern = re.compile('|'.join(
+        re.escape(k) for keywords in analysis_plan.values() for k in keywords
+    ))
+
     print("\n[*] Analysis Plan:")
-    for category, files_found in analysis_plan.items():
-        matching_files = [f for f in files if any(keyword in f.name.lower() for keyword in files_found)]
+    for category, pattern in category_patterns.items():
+        matching_files = [f for f, name in file_names if pattern.search(name)]
         if matching_files:
             print(f"\n  {category}:")
             for f in matching_files[:3]:  # Show first 3
@@ -54,8 +65,8 @@ def main():
     print("\n[*] Recommended Workflow:")
     print("1. Upload high-value files to NotebookLM:")
     important_files = []
-    for f in files[:5]:  # Show first 5 files
-        if any(keyword in f.name.lower() for keywords in analysis_plan.values() for keyword in keywords):
+    for f, name in file_names[:5]:  # Show first 5 files
+        if keyword_pattern.search(name):
             important_files.append(f)
 
     if important_files:
@@ -84,13 +95,14 @@ def main():
 
     if args.output:
         output_path = Path(args.output)
-        with open(output_path, 'w') as f:
-            f.write("# Local File Analysis Report\n\n")
-            f.write(f"Directory: {dir_path}\n")
-            f.write(f"Files found: {len(files)}\n\n")
-            f.write("## Priority Files for Upload\n\n")
-            for f in important_files:
-                f.write(f"- {f.relative_to(dir_path)}\n")
+        parts = [
+            "# Local File Analysis Report\n\n",
+            f"Directory: {dir_path}\n",
+            f"Files found: {len(files)}\n\n",
+            "## Priority Files for Upload\n\n",
+        ]
+        parts.extend(f"- {entry.relative_to(dir_path)}\n" for entry in important_files)
+        output_path.write_text("".join(parts), encoding='utf-8')
         print(f"\n[*] Report saved to: {output_path}")
 
     return 0
@@ -3,13 +3,41 @@
 NotebookLM 替代方案 - 使用本地 cognee API 分析文档
 """
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from requests_toolbelt import MultipartEncoder
+from urllib3.util.retry import Retry
 import sys
 import os
 import time
 
 COGNEE_BASE = "http://localhost:8000/api/v1"
 
+# (connect, read) 超时，单位秒；cognify 需要跑模型，读超时放宽
+REQUEST_TIMEOUT = (3.05, 30)
+COGNIFY_TIMEOUT = (3.05, 600)
+
+def make_session():
+    """创建对连接失败和 429/5xx 指数退避重试的会话
+
+    read=0：读超时不重试，避免已发出的 POST 被重复提交
+    """
+    retry = Retry(
+        total=5,
+        read=0,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "POST"]),
+        raise_on_status=False,
+    )
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(max_retries=retry))
+    session.mount("https://", HTTPAdapter(max_retries=retry))
+    return session
+
+session = make_session()
+
 def upload_file(filepath, dataset_name="default"):
     """上传文件到 cognee"""
     if not os.path.exists(filepath):
@@ -18,14 +46,23 @@ def upload_file(filepath, dataset_name="default"):
     
     print(f"📤 上传文件：{filepath}")
     
+    # 流式 multipart 上传，文件按块写入 socket，不整体读入内存；
+    # 流式请求体发送后无法重放，所以这里不走带重试的 session
     with open(filepath, 'rb') as f:
-        files = {'files': f}
-        data = {'dataset_name': dataset_name}
-        response = requests.post(f"{COGNEE_BASE}/add", files=files, data=data)
+        encoder = MultipartEncoder(fields={
+            'dataset_name': dataset_name,
+            'files': (os.path.basename(filepath), f, 'application/octet-stream'),
+        })
+        response = requests.post(
+            f"{COGNEE_BASE}/add",
+            data=encoder,
+            headers={"Content-Type": encoder.content_type},
+            timeout=REQUEST_TIMEOUT
+        )
     
     if response.status_code == 200:
         print(f"✅ 上传成功")
-        return response.json()
+        return orjson.loads(response.content)
     else:
         print(f"❌ 上传失败：{response.text}")
         return None
@@ -34,15 +71,17 @@ def process_dataset(dataset_name="default"):
     """处理数据集（cognify）"""
     print(f"🔄 处理数据集：{dataset_name}")
     
+    # cognify 会在服务端排队任务，不走重试会话，避免重复提交
     response = requests.post(
         f"{COGNEE_BASE}/cognify",
         json={"dataset_name": dataset_name},
-        headers={"Content-Type": "application/json"}
+        headers={"Content-Type": "application/json"},
+        timeout=COGNIFY_TIMEOUT
     )
     
     if response.status_code == 200:
         print(f"✅ 处理完成")
-        return response.json()
+        return orjson.loads(response.content)
     else:
         print(f"❌ 处理失败：{response.text}")
         return None
@@ -51,14 +90,15 @@ def search(query, dataset_name="default"):
     """搜索/问答"""
     print(f"🔍 搜索：{query}")
     
-    response = requests.post(
+    response = session.post(
         f"{COGNEE_BASE}/search",
         json={"query": query, "dataset_name": dataset_name},
-        headers={"Content-Type": "application/json"}
+        headers={"Content-Type": "application/json"},
+        timeout=REQUEST_TIMEOUT
     )
     
     if response.status_code == 200:
-        result = response.json()
+        result = orjson.loads(response.content)
         print(f"\n{'='*60}")
         print(f"📝 答案：\n")
         if isinstance(result, dict) and 'results' in result:
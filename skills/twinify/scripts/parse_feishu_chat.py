@@ -2,54 +2,125 @@
 """Parse Feishu/Lark chat export and extract messages by sender."""
 
 import re
+import hashlib
 import json
+import mmap
+import pickle
 import sys
 import os
-from collections import Counter, defaultdict
+from collections import Counter, defaultdict, namedtuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Feishu export format: YYYY/MM/DD HH:MM:SS\nSender: Message
 # Or: YYYY-MM-DD HH:MM:SS\nSender: Message
-DATE_PATTERN = re.compile(r'^(\d{4}[-/]\d{2}[-/]\d{2})\s+(\d{2}:\d{2}:\d{2})$')
-SENDER_PATTERN = re.compile(r'^(.+?):\s*(.*)$')
+# Lines are matched as raw bytes; only captured fields are decoded.
+# Date lines are recognised by shape: digits are mapped to '0' with one C-level
+# translate() and the result looked up in DATE_SHAPES. Only lines that end in
+# a time but have an unusual separator run fall back to DATE_PATTERN.
+DIGITS_TO_ZERO = bytes.maketrans(b'0123456789', b'0000000000')
+DATE_SHAPES = frozenset({b'0000-00-00 00:00:00', b'0000/00/00 00:00:00',
+                         b'0000-00/00 00:00:00', b'0000/00-00 00:00:00'})
+DATE_PATTERN = re.compile(rb'\d{4}[-/]\d{2}[-/]\d{2}\s+\d{2}:\d{2}:\d{2}$')
+# The sender pattern is the non-backtracking form of (.+?): -- everything
+# up to the first colon, or up to the second one if the line starts with ':'.
+SENDER_PATTERN = re.compile(rb'(?P<sender>[^:]+|:[^:]*):\s*(?P<text>.*)$')
+
+# Emoji usage
+EMOJI_PATTERN = re.compile(
+    "["
+    "\U0001F600-\U0001F64F"
+    "\U0001F300-\U0001F5FF"
+    "\U0001F680-\U0001F6FF"
+    "\U0001F1E0-\U0001F1FF"
+    "\U00002702-\U000027B0"
+    "\U0001f926-\U0001f937"
+    "\U00010000-\U0010ffff"
+    "\u2640-\u2642"
+    "\u2600-\u2B55"
+    "\u200d"
+    "\u23cf"
+    "\u23e9"
+    "\u231a"
+    "\ufe0f"
+    "\u3030"
+    "]+", flags=re.UNICODE
+)
+
+# Laugh patterns (Chinese and English). Only used with search(), so each
+# alternative is reduced to its shortest match: k{3,} -> kkk, ha{2,} -> haa,
+# hua+ -> hua, ahu+ -> ahu, 哈哈 + -> '哈哈 ' (kkkk+ and 哈哈哈 + were redundant).
+# Pure literals leave the engine nothing to backtrack over.
+LAUGH_PATTERN = re.compile(r'kkk|haa|hua|ahu|哈哈 |嘻嘻 |嘿嘿 ', re.IGNORECASE)
+
+class DecodeCache(dict):
+    """Map raw bytes to their decoded str, decoding each distinct value once."""
+
+    def __missing__(self, raw):
+        value = self[raw] = raw.decode('utf-8')
+        return value
+
+# Tuples instead of per-message dicts: a fraction of the memory on big exports
+Message = namedtuple('Message', ['date', 'time', 'sender', 'text'])
+
+# Part of the --cache key; bump whenever parse_chat(), analyze() or Message
+# change what gets pickled, so stale results from an older version are ignored
+CACHE_VERSION = 1
 
 def parse_chat(filepath, target_name):
-    """Parse Feishu export and return structured data."""
-    messages = []
+    """Parse Feishu export and return (message_count, target_msgs, other_msgs)."""
+    message_count = 0
     target_msgs = []
     other_msgs = []
     current_date = None
     current_time = None
     current_sender = None
-    current_text = None
+    # Lines of the current message, joined once when the message is saved
+    current_text_parts = None
+    # Senders, dates and times repeat across messages; share one str per value
+    decoded = DecodeCache()
+    # Seed with the target so matching senders are this exact object and
+    # can be checked with 'is' (UTF-8 is canonical: equal str <=> equal bytes)
+    decoded[target_name.encode('utf-8')] = target_name
 
-    with open(filepath, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.rstrip('\n')
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return message_count, target_msgs, other_msgs
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    with mm:
+        # mmap.readline splits lines in C without a userspace copy of the file
+        for line in iter(mm.readline, b''):
+            line = line.rstrip(b'\r\n')
             
             # Skip empty lines
             if not line.strip():
                 continue
             
-            # Check for date/time line
-            date_match = DATE_PATTERN.match(line)
-            if date_match:
+            # Check for date/time line; the date is the first 10 bytes, the time the last 8
+            if ((len(line) == 19 and line.translate(DIGITS_TO_ZERO) in DATE_SHAPES)
+                    or (line[-3:-2] == b':' and DATE_PATTERN.match(line))):
                 # Save previous message if exists
-                if current_sender and current_text is not None:
-                    msg = {
-                        'date': current_date,
-                        'time': current_time,
-                        'sender': current_sender,
-                        'text': current_text
-                    }
-                    messages.append(msg)
-                    if current_sender == target_name:
+                if current_sender and current_text_parts is not None:
+                    message_count += 1
+                    msg = Message(current_date, current_time, current_sender, '\n'.join(current_text_parts))
+                    if current_sender is target_name:
                         target_msgs.append(msg)
                     else:
                         other_msgs.append(msg)
                 
-                current_date, current_time = date_match.groups()
+                current_date = decoded[line[:10]]
+                current_time = decoded[line[-8:]]
                 current_sender = None
-                current_text = None
+                current_text_parts = None
                 continue
             
             # Check for sender: message line
@@ -57,44 +128,76 @@ def parse_chat(filepath, target_name):
                 sender_match = SENDER_PATTERN.match(line)
                 if sender_match:
                     # Save previous message if exists
-                    if current_sender and current_text is not None:
-                        msg = {
-                            'date': current_date,
-                            'time': current_time,
-                            'sender': current_sender,
-                            'text': current_text
-                        }
-                        messages.append(msg)
-                        if current_sender == target_name:
+                    if current_sender and current_text_parts is not None:
+                        message_count += 1
+                        msg = Message(current_date, current_time, current_sender, '\n'.join(current_text_parts))
+                        if current_sender is target_name:
                             target_msgs.append(msg)
                         else:
                             other_msgs.append(msg)
                     
-                    current_sender, current_text = sender_match.groups()
+                    current_sender = decoded[sender_match['sender']]
+                    # \s* above only strips ASCII whitespace on bytes
+                    current_text_parts = [sender_match['text'].decode('utf-8').lstrip()]
                 elif current_sender:
                     # Continuation of previous message
-                    current_text += '\n' + line
+                    line = line.decode('utf-8')
+                    if not line.strip():
+                        continue
+                    current_text_parts.append(line)
 
     # Don't forget the last message
-    if current_sender and current_text is not None:
-        msg = {
-            'date': current_date,
-            'time': current_time,
-            'sender': current_sender,
-            'text': current_text
-        }
-        messages.append(msg)
-        if current_sender == target_name:
+    if current_sender and current_text_parts is not None:
+        message_count += 1
+        msg = Message(current_date, current_time, current_sender, '\n'.join(current_text_parts))
+        if current_sender is target_name:
             target_msgs.append(msg)
         else:
             other_msgs.append(msg)
 
-    return messages, target_msgs, other_msgs
+    return message_count, target_msgs, other_msgs
+
+
+def count_top_chars(text, n=100):
+    """Return the n most common non-space, non-digit characters in text.
+
+    Uses a NumPy histogram over UTF-32 codepoints when available; ties are
+    broken by first occurrence, matching Counter.most_common.
+    """
+    if np is None:
+        return Counter(c for c in text if not c.isspace() and not c.isdigit()).most_common(n)
+
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    values, first_seen, counts = np.unique(codes, return_index=True, return_counts=True)
+
+    # Only sort the candidates that can reach the top n: everything at or above
+    # the k-th largest count, with slack for the whitespace/digits filtered out
+    k = n + 32
+    if len(counts) > k:
+        kth = np.partition(counts, len(counts) - k)[len(counts) - k]
+        candidates = np.flatnonzero(counts >= kth)
+    else:
+        candidates = np.arange(len(counts))
+
+    while True:
+        top = []
+        order = candidates[np.lexsort((first_seen[candidates], -counts[candidates]))]
+        for i in order:
+            c = chr(values[i])
+            if c.isspace() or c.isdigit():
+                continue
+            top.append((c, int(counts[i])))
+            if len(top) == n:
+                return top
+        if len(candidates) == len(counts):
+            return top
+        # Filtering left fewer than n; rank everything
+        candidates = np.arange(len(counts))
 
 
 def analyze(target_msgs, target_name):
     """Analyze target's messages for patterns."""
-    texts = [m['text'] for m in target_msgs if m['text']]
+    texts = [m.text for m in target_msgs if m.text]
 
     # Filter out system messages and media placeholders
     text_msgs = [t for t in texts if not t.startswith('[系统消息]') 
@@ -105,51 +208,31 @@ def analyze(target_msgs, target_name):
     # Word frequency (Chinese-aware: split by characters for CJK)
     all_text = ' '.join(text_msgs)
     # Simple character frequency for Chinese
-    char_freq = Counter(c for c in all_text if not c.isspace() and not c.isdigit())
-    top_chars = char_freq.most_common(100)
-
-    # Message length stats
-    lengths = [len(t) for t in text_msgs]
-    avg_len = sum(lengths) / len(lengths) if lengths else 0
-
-    # Emoji usage
-    emoji_pattern = re.compile(
-        "["
-        "\U0001F600-\U0001F64F"
-        "\U0001F300-\U0001F5FF"
-        "\U0001F680-\U0001F6FF"
-        "\U0001F1E0-\U0001F1FF"
-        "\U00002702-\U000027B0"
-        "\U0001f926-\U0001f937"
-        "\U0010000-\U0010ffff"
-        "\u2640-\u2642"
-        "\u2600-\u2B55"
-        "\u200d"
-        "\u23cf"
-        "\u23e9"
-        "\u231a"
-        "\ufe0f"
-        "\u3030"
-        "]+", flags=re.UNICODE
-    )
-    emojis = []
-    for t in text_msgs:
-        emojis.extend(emoji_pattern.findall(t))
-    emoji_freq = Counter(emojis).most_common(20)
+    top_chars = count_top_chars(all_text, 100)
 
-    # Laugh patterns (Chinese and English)
-    laugh_pattern = re.compile(r'k{3,}|ha{2,}|hua+|ahu+|kkkk+|哈哈 +|嘻嘻 +|嘿嘿 +|哈哈哈 +', re.IGNORECASE)
-    laugh_count = sum(1 for t in text_msgs if laugh_pattern.search(t))
+    # Emoji stats: one findall over all messages; '\x01' is outside the emoji
+    # class, so no match can span two messages
+    emoji_freq = Counter(EMOJI_PATTERN.findall('\x01'.join(text_msgs)))
 
-    # Common phrases (2-4 character sequences for Chinese)
-    phrases = []
+    # Laugh and phrase stats in a single pass over the messages
+    laugh_count = 0
+    phrase_freq = Counter()
     for t in text_msgs:
-        # Extract 2-4 char sequences
-        for i in range(len(t) - 1):
-            phrases.append(t[i:i+2])
-        for i in range(len(t) - 2):
-            phrases.append(t[i:i+3])
-    phrase_freq = Counter(phrases).most_common(50)
+        n = len(t)
+        if LAUGH_PATTERN.search(t):
+            laugh_count += 1
+        # Common phrases (2-4 character sequences for Chinese)
+        phrase_freq.update(t[i:i+2] for i in range(n - 1))
+        phrase_freq.update(t[i:i+3] for i in range(n - 2))
+
+    # Message length stats
+    if np is not None:
+        lengths = np.fromiter(map(len, text_msgs), dtype=np.int64, count=len(text_msgs))
+        avg_len = float(lengths.mean()) if lengths.size else 0
+    else:
+        avg_len = sum(map(len, text_msgs)) / len(text_msgs) if text_msgs else 0
+    emoji_freq = emoji_freq.most_common(20)
+    phrase_freq = phrase_freq.most_common(50)
 
     return {
         'target_name': target_name,
@@ -163,17 +246,44 @@ def analyze(target_msgs, target_name):
     }
 
 
+def json_bytes(obj, indent=False):
+    """Serialize obj to UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+
+def write_json_list(f, key, items):
+    """Stream items as a JSON object member '"key": [...]', one object per line."""
+    f.write(f',\n"{key}": ['.encode('utf-8'))
+    sep = b'\n'
+    for item in items:
+        f.write(sep)
+        f.write(json_bytes(item))
+        sep = b',\n'
+    f.write(b'\n]')
+
+
+def cache_file(output_dir, filepath, target_name):
+    """Cache path for a parse of filepath for target_name, keyed on path, mtime, size and CACHE_VERSION."""
+    st = os.stat(filepath)
+    key = f"{CACHE_VERSION}|{os.path.abspath(filepath)}|{st.st_mtime_ns}|{st.st_size}|{target_name}"
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(output_dir, '.cache', f"{digest}.pkl")
+
+
 def main():
-    if len(sys.argv) < 4:
-        print("Usage: parse_feishu_chat.py <chat_export.txt> <target_name> <output_dir>")
+    use_cache = '--cache' in sys.argv[1:]
+    args = [a for a in sys.argv[1:] if a != '--cache']
+    if len(args) < 3:
+        print("Usage: parse_feishu_chat.py <chat_export.txt> <target_name> <output_dir> [--cache]")
         print("  chat_export.txt  - Feishu exported chat file")
         print("  target_name      - Name of person to clone (as in chat)")
         print("  output_dir       - Directory to save output")
+        print("  --cache          - Reuse parse/analysis results for an unchanged export")
         sys.exit(1)
 
-    filepath = sys.argv[1]
-    target_name = sys.argv[2]
-    output_dir = sys.argv[3]
+    filepath, target_name, output_dir = args[:3]
 
     if not os.path.exists(filepath):
         print(f"Error: File not found: {filepath}")
@@ -184,39 +294,49 @@ def main():
     print(f"Parsing Feishu chat from: {filepath}")
     print(f"Target: {target_name}")
 
-    messages, target_msgs, other_msgs = parse_chat(filepath, target_name)
+    cache_path = cache_file(output_dir, filepath, target_name) if use_cache else None
+    if cache_path and os.path.exists(cache_path):
+        print(f"Using cached results: {cache_path}")
+        with open(cache_path, 'rb') as f:
+            message_count, target_msgs, other_msgs, stats = pickle.load(f)
+    else:
+        message_count, target_msgs, other_msgs = parse_chat(filepath, target_name)
+        stats = None
 
-    print(f"Total messages: {len(messages)}")
+    print(f"Total messages: {message_count}")
     print(f"Target messages: {len(target_msgs)}")
     print(f"Other messages: {len(other_msgs)}")
 
     # Analyze
-    stats = analyze(target_msgs, target_name)
+    if stats is None:
+        stats = analyze(target_msgs, target_name)
+        if cache_path:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, 'wb') as f:
+                pickle.dump((message_count, target_msgs, other_msgs, stats), f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
     print(f"Text messages (no media): {stats['text_messages']}")
     print(f"Avg chars per message: {stats['avg_chars_per_msg']}")
     print(f"Laugh ratio: {stats['laugh_ratio']}")
 
-    # Save parsed data
-    output = {
-        'stats': stats,
-        'target_messages': [{'date': m['date'], 'time': m['time'], 'text': m['text']}
-                           for m in target_msgs if m['text']],
-        'other_messages': [{'date': m['date'], 'time': m['time'], 'sender': m['sender'], 'text': m['text']}
-                          for m in other_msgs if m['text']],
-    }
-
+    # Save parsed data, streaming messages instead of building one big document
     output_path = os.path.join(output_dir, 'parsed_messages.json')
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    with open(output_path, 'wb') as f:
+        f.write(b'{\n"stats": ')
+        f.write(json_bytes(stats, indent=True))
+        write_json_list(f, 'target_messages',
+                        ({'date': m.date, 'time': m.time, 'text': m.text}
+                         for m in target_msgs if m.text))
+        write_json_list(f, 'other_messages',
+                        (m._asdict() for m in other_msgs if m.text))
+        f.write(b'\n}\n')
 
     print(f"Output saved to: {output_path}")
 
     # Also save target messages as plain text for easy reading
     txt_path = os.path.join(output_dir, 'target_messages.txt')
     with open(txt_path, 'w', encoding='utf-8') as f:
-        for m in target_msgs:
-            if m['text']:
-                f.write(f"[{m['date']}, {m['time']}] {m['text']}\n")
+        f.writelines(f"[{m.date}, {m.time}] {m.text}\n" for m in target_msgs if m.text)
 
     print(f"Target messages text saved to: {txt_path}")
 